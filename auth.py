@@ -16,7 +16,13 @@ SECRET_KEY = ""
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Work factor pinned explicitly (passlib 1.7.4's default), so new hashes don't
+# change cost with a passlib upgrade. Hash only on register; login only verifies.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=29000,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 
@@ -58,7 +64,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(
+# Plain def (not async): the user lookup is a blocking DB query, so FastAPI
+# must run it in its threadpool rather than on the event loop.
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
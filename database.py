@@ -12,10 +12,16 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./financial_app.db")
 
 # For postgres, SQLAlchemy expects the new style: postgresql://....
 # Render's managed Postgres will already provide a proper URL.
+# File-backed SQLite and Postgres both get a QueuePool, sized for the dashboard's
+# threaded fan-out across concurrent requests.
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
     pool_pre_ping=True,
+    pool_recycle=3600,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,6 +1,14 @@
 # finance.py
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import functools
+import inspect
 import math
+import os
+import pickle
+import re
+import threading
+import time
 import numpy as np
 import pandas as pd
 import yfinance as yf
@@ -24,21 +32,182 @@ def _clean_scalar(x: Optional[float]) -> Optional[float]:
     return v
 
 
-def _is_valid_number(x) -> bool:
+_INF = float("inf")
+
+
+def _finite(x) -> bool:
+    """
+    True if x is a finite number. Expects None or a float (e.g. from _get_item);
+    NaN fails x == x, so no float()/isnan/isinf calls are needed.
+    """
+    return x is not None and x == x and -_INF < x < _INF
+
+
+def _first_non_na(val):
+    """
+    First non-NA element of an array-like (flattened), or None if there is none.
+    One isna pass + argmax instead of separate all/mask/index passes.
+    """
+    arr = np.asarray(val).ravel()
+    if arr.size == 0:
+        return None
+    mask = ~pd.isna(arr)
+    i = mask.argmax()
+    return arr[i] if mask[i] else None
+
+
+# ---------- Cache ----------
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+HISTORY_TTL = 24 * 3600        # prices change at most daily
+FUNDAMENTALS_TTL = 7 * 24 * 3600
+
+_TK_CACHE_MAXSIZE = 1024
+_tk_cache: "OrderedDict[str, Tuple[float, yf.Ticker]]" = OrderedDict()
+_tk_lock = threading.Lock()
+
+
+def _get_ticker(symbol: str) -> yf.Ticker:
+    """
+    Reuse one yf.Ticker per symbol so the price and fundamentals fetches share it.
+    Entries are rebuilt after HISTORY_TTL because yfinance memoizes data on the object.
+    """
+    now = time.time()
+    with _tk_lock:
+        hit = _tk_cache.get(symbol)
+        if hit is not None and now - hit[0] <= HISTORY_TTL:
+            _tk_cache.move_to_end(symbol)
+            return hit[1]
+        tk = yf.Ticker(symbol)
+        _tk_cache[symbol] = (now, tk)
+        _tk_cache.move_to_end(symbol)
+        while len(_tk_cache) > _TK_CACHE_MAXSIZE:
+            _tk_cache.popitem(last=False)
+        return tk
+
+
+def _cacheable(value) -> bool:
+    """Don't persist empty results, so a transient yfinance failure isn't cached."""
+    if isinstance(value, pd.DataFrame):
+        return not value.empty
+    if isinstance(value, dict):
+        return any(_cacheable(v) for v in value.values())
+    if isinstance(value, tuple):
+        return any(v is not None for v in value)
+    return value is not None
+
+
+def _cache_path(name: str, key: tuple) -> str:
+    safe = "_".join(re.sub(r"[^A-Za-z0-9.=-]", "-", str(k)) for k in key)
+    return os.path.join(CACHE_DIR, f"{name}_{safe}.pkl")
+
+
+def _ttl_cache(ttl: float, maxsize: int = 512):
     """
-    True if x is a normal finite number (no NaN/inf) that can be cast to float.
+    Memoize a fetcher for ttl seconds: an in-process LRU backed by pickles on disk,
+    so repeat views and restarted workers skip the yfinance round-trip.
+    The wrapper also exposes cache_lookup(*args) (None on miss, never fetches)
+    and cache_store(value, *args) for batch fetchers that fill the same cache.
     """
-    return _clean_scalar(x) is not None
+    def decorator(fn):
+        sig = inspect.signature(fn)
+        memo: "OrderedDict[tuple, Tuple[float, object]]" = OrderedDict()
+        lock = threading.Lock()
+
+        def _key(args, kwargs) -> tuple:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(bound.arguments.values())
+
+        def _remember(key, stamp, value):
+            with lock:
+                memo[key] = (stamp, value)
+                memo.move_to_end(key)
+                while len(memo) > maxsize:
+                    memo.popitem(last=False)
+
+        def cache_lookup(*args, **kwargs):
+            key = _key(args, kwargs)
+            now = time.time()
+
+            # 1. Memory
+            with lock:
+                hit = memo.get(key)
+                if hit is not None and now - hit[0] <= ttl:
+                    memo.move_to_end(key)
+                    return hit[1]
+
+            # 2. Disk
+            path = _cache_path(fn.__name__, key)
+            try:
+                mtime = os.path.getmtime(path)
+                if now - mtime > ttl:
+                    return None
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+            except Exception:
+                return None
+            _remember(key, mtime, value)
+            return value
+
+        def cache_store(value, *args, **kwargs):
+            if not _cacheable(value):
+                return
+            key = _key(args, kwargs)
+            path = _cache_path(fn.__name__, key)
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                # pid too: forked workers can reuse the same thread ids
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except Exception:
+                pass
+            _remember(key, time.time(), value)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            value = cache_lookup(*args, **kwargs)
+            if value is None:
+                # 3. Network
+                value = fn(*args, **kwargs)
+                cache_store(value, *args, **kwargs)
+            return value
+
+        wrapper.cache_lookup = cache_lookup
+        wrapper.cache_store = cache_store
+        return wrapper
+
+    return decorator
 
 
 # ---------- yfinance wrappers ----------
 
+def _to_numeric_statement(df) -> pd.DataFrame:
+    """
+    Statement frame with a string index and float64 cells (non-numeric -> NaN).
+    yfinance hands these back as object dtype; casting once here lets
+    _get_item and dataframe_to_statement take their typed fast paths.
+    float64 rather than float32: statement values run to 1e11+, beyond float32's precision.
+    """
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return pd.DataFrame()
+    try:
+        out = df.apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    except (TypeError, ValueError):
+        out = df.copy()
+    out.index = out.index.astype(str)
+    return out
+
+
+@_ttl_cache(HISTORY_TTL)
 def fetch_price_history(ticker: str, period: str = "5y") -> pd.DataFrame:
     """
     Always returns a DataFrame. If yfinance gives only NaNs or fails, returns an empty DataFrame.
     """
     try:
-        tk = yf.Ticker(ticker)
+        tk = _get_ticker(ticker)
         hist = tk.history(period=period)
         if not isinstance(hist, pd.DataFrame) or hist.empty:
             return pd.DataFrame()
@@ -50,90 +219,188 @@ def fetch_price_history(ticker: str, period: str = "5y") -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def fetch_fundamentals(ticker: str) -> Dict[str, pd.DataFrame]:
+def _close_points(hist: pd.DataFrame) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (latest close, first close) of a ~1y daily history; the first close is
+    only used as the year-ago price if the history really spans a year.
+    """
+    if not isinstance(hist, pd.DataFrame) or hist.empty or "Close" not in hist.columns:
+        return None, None
+    close = hist["Close"].dropna()
+    if close.empty:
+        return None, None
+    values = close.to_numpy(dtype=np.float64, copy=False)
+    px_now = _clean_scalar(values[-1])
+    px_1y = None
+    if close.index[-1] - close.index[0] >= pd.Timedelta(days=360):
+        px_1y = _clean_scalar(values[0])
+    return px_now, px_1y
+
+
+@_ttl_cache(HISTORY_TTL)
+def fetch_close_points(ticker: str) -> Tuple[Optional[float], Optional[float]]:
     """
-    Fetch income statement, balance sheet, cash flow and info as DataFrames.
-    DataFrames may be empty, but never None.
+    (latest close, close one year earlier) from a single 1y daily history request,
+    for callers that only need the price and one-year return.
+    The year-ago close is None if the history covers less than a year.
     """
-    tk = yf.Ticker(ticker)
+    try:
+        hist = _get_ticker(ticker).history(period="1y", interval="1d", actions=False)
+        return _close_points(hist)
+    except Exception:
+        return None, None
+
 
-    income = getattr(tk, "income_stmt", None)
-    if income is None or not isinstance(income, pd.DataFrame) or income.empty:
-        income = tk.financials
+# yf.download keeps per-call results in module-level state, so concurrent
+# downloads from different requests must not overlap.
+_download_lock = threading.Lock()
 
-    balance = getattr(tk, "balance_sheet", None)
-    if balance is None or not isinstance(balance, pd.DataFrame) or balance.empty:
-        balance = tk.balance_sheet
 
-    cashflow = getattr(tk, "cashflow", None)
-    if cashflow is None or not isinstance(cashflow, pd.DataFrame) or cashflow.empty:
-        cashflow = tk.cashflow
+def fetch_close_points_batch(
+    tickers: List[str],
+) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """
+    fetch_close_points for many tickers. Cached tickers are served from the cache;
+    the rest share one yf.download call (one session, fetched in parallel by yfinance)
+    and are written back to the cache. Tickers the download returned nothing for
+    fall back to fetch_close_points.
+    """
+    points: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+    missing: List[str] = []
+    for t in dict.fromkeys(tickers):
+        hit = fetch_close_points.cache_lookup(t)
+        if hit is not None:
+            points[t] = hit
+        else:
+            missing.append(t)
+
+    if not missing:
+        return points
 
-    info = {}
     try:
-        info = tk.info
+        with _download_lock:
+            data = yf.download(
+                " ".join(missing),
+                period="1y",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=True,
+                actions=False,
+                threads=True,
+                progress=False,
+            )
     except Exception:
-        info = {}
+        data = pd.DataFrame()
+
+    for t in missing:
+        hist = pd.DataFrame()
+        if isinstance(data, pd.DataFrame) and not data.empty:
+            if isinstance(data.columns, pd.MultiIndex):
+                # yf.download upper-cases symbols; points and the cache stay keyed as given
+                sym = t.upper()
+                if sym in data.columns.get_level_values(0):
+                    hist = data[sym]
+            else:
+                hist = data
+        pts = _close_points(hist)
+        if pts == (None, None):
+            # Not in the batch result (or all-NaN): retry this one on its own
+            points[t] = fetch_close_points(t)
+        else:
+            points[t] = pts
+            fetch_close_points.cache_store(pts, t)
+
+    return points
+
+
+@_ttl_cache(FUNDAMENTALS_TTL)
+def _fetch_statements(ticker: str) -> Dict[str, pd.DataFrame]:
+    """Income statement, balance sheet and cash flow; these only change quarterly."""
+    tk = _get_ticker(ticker)
+
+    # Each property is a separate Yahoo request; tk.financials is an alias of
+    # tk.income_stmt, so there is nothing to fall back to.
+    income, balance, cashflow = (
+        _to_numeric_statement(df) for df in (tk.income_stmt, tk.balance_sheet, tk.cashflow)
+    )
+    return {"income": income, "balance": balance, "cashflow": cashflow}
 
-    for df in (income, balance, cashflow):
-        if isinstance(df, pd.DataFrame) and not df.empty:
-            df.index = df.index.astype(str)
 
-    info_df = (
-        pd.DataFrame.from_dict(info, orient="index", columns=["value"])
-        if isinstance(info, dict)
-        else pd.DataFrame()
-    )
+@_ttl_cache(HISTORY_TTL)
+def fetch_info(ticker: str) -> Dict[str, Any]:
+    """
+    yfinance info dict ({} on failure). Cached like prices rather than statements,
+    since it carries quote fields (currentPrice, previousClose, marketCap).
+    """
+    try:
+        info = _get_ticker(ticker).info
+    except Exception:
+        return {}
+    return info if isinstance(info, dict) else {}
 
-    return {
-        "income": income if isinstance(income, pd.DataFrame) else pd.DataFrame(),
-        "balance": balance if isinstance(balance, pd.DataFrame) else pd.DataFrame(),
-        "cashflow": cashflow if isinstance(cashflow, pd.DataFrame) else pd.DataFrame(),
-        "info": info_df,
-    }
+
+def fetch_fundamentals(ticker: str) -> Dict[str, Any]:
+    """
+    Fetch income statement, balance sheet and cash flow as DataFrames, plus the
+    info dict under "info_raw". DataFrames may be empty, but never None.
+    """
+    return {**_fetch_statements(ticker), "info_raw": fetch_info(ticker)}
 
 
 # ---------- Statement item getter ----------
 
-def _get_item(df: pd.DataFrame, candidates: List[str]) -> Optional[float]:
+def _build_index(df: pd.DataFrame) -> Tuple[Dict[str, str], pd.Index]:
+    """
+    Lowercased row labels of a statement, built once per df:
+      - {label.lower(): label} for exact hits (first occurrence wins)
+      - the same lowercased labels as a pd.Index, in row order, for vectorized
+        contains matching
+    """
+    lowered = df.index.astype(str).str.lower()
+    keep = ~lowered.duplicated()
+    lc = lowered[keep]
+    return dict(zip(lc, df.index[keep])), lc
+
+
+def _get_item(
+    df: pd.DataFrame,
+    candidates: Tuple[str, ...],
+    labels: Optional[Tuple[Dict[str, str], pd.Index]] = None,
+) -> Optional[float]:
     """
     Safely extract a scalar number from a financial statement row by label.
+    Candidates must already be lowercase.
     Handles:
-      - exact label
+      - exact label (case-insensitive)
       - case-insensitive contains match
       - numpy arrays / Series in the cell
+    Pass labels from _build_index(df) when calling repeatedly on the same df.
     Always returns a clean float or None.
     """
     if df is None or df.empty:
         return None
+    if labels is None:
+        labels = _build_index(df)
+    index_map, lc = labels
 
     def _extract_scalar(val):
-        # Handle arrays / series / lists
+        # Handle arrays / series / lists: take first non-NA element
         if isinstance(val, (np.ndarray, pd.Series, list, tuple)):
-            arr = np.array(val).flatten()
-            # All NA? -> None
-            if arr.size == 0 or np.all(pd.isna(arr)):
-                return None
-            # Take first non-NA element
-            mask = ~pd.isna(arr)
-            if not mask.any():
-                return None
-            val = arr[mask][0]
+            val = _first_non_na(val)
         return _clean_scalar(val)
 
-    for label in candidates:
+    for key in candidates:
         # 1. Exact label
-        if label in df.index:
-            cell = df.loc[label].iloc[0]
-            scalar = _extract_scalar(cell)
+        match = index_map.get(key)
+        if match is not None:
+            scalar = _extract_scalar(df.loc[match].iloc[0])
             if scalar is not None:
                 return scalar
 
         # 2. Fuzzy, case-insensitive contains
-        matches = [idx for idx in df.index if label.lower() in idx.lower()]
-        if matches:
-            cell = df.loc[matches[0]].iloc[0]
-            scalar = _extract_scalar(cell)
+        hits = lc[lc.str.contains(key, regex=False)]
+        if len(hits):
+            scalar = _extract_scalar(df.loc[index_map[hits[0]]].iloc[0])
             if scalar is not None:
                 return scalar
 
@@ -142,6 +409,60 @@ def _get_item(df: pd.DataFrame, candidates: List[str]) -> Optional[float]:
 
 # ---------- Ratios ----------
 
+# Statement row labels to try, in order (lowercase, as _get_item expects)
+_REVENUE = ("total revenue", "totalrevenue", "revenue")
+_NET_INCOME = ("net income", "netincome", "net income common stockholders")
+_TOTAL_EQUITY = ("total stockholder equity", "total equity", "totalequity")
+_TOTAL_DEBT = ("total debt", "totaldebt", "long term debt", "longtermdebt")
+_CURRENT_ASSETS = ("total current assets", "current assets", "currentassets")
+_CURRENT_LIAB = ("total current liabilities", "current liabilities", "currentliabilities")
+
+
+def _statement_items(
+    income: pd.DataFrame, balance: pd.DataFrame
+) -> Tuple[Optional[float], ...]:
+    """
+    Raw statement numbers needed for the ratios (clean floats or None):
+    revenue, net income, total equity, total debt, current assets, current liabilities.
+    """
+    # ----- Income statement -----
+    income_labels = _build_index(income) if income is not None else None
+    revenue = _get_item(income, _REVENUE, income_labels)
+    net_income = _get_item(income, _NET_INCOME, income_labels)
+
+    # ----- Balance sheet -----
+    balance_labels = _build_index(balance) if balance is not None else None
+    total_equity = _get_item(balance, _TOTAL_EQUITY, balance_labels)
+    total_debt = _get_item(balance, _TOTAL_DEBT, balance_labels)
+    current_assets = _get_item(balance, _CURRENT_ASSETS, balance_labels)
+    current_liab = _get_item(balance, _CURRENT_LIAB, balance_labels)
+
+    return revenue, net_income, total_equity, total_debt, current_assets, current_liab
+
+
+def price_points(price_hist: pd.DataFrame) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (latest close, close 252 trading days earlier) from a price history.
+    The lagged close is None unless the history covers more than a year.
+    """
+    if (
+        not isinstance(price_hist, pd.DataFrame)
+        or price_hist.empty
+        or "Close" not in price_hist.columns
+    ):
+        return None, None
+
+    # Index the underlying array directly instead of two .iloc dispatches
+    try:
+        close = price_hist["Close"].to_numpy(dtype=np.float64, copy=False)
+    except (TypeError, ValueError):
+        return None, None
+
+    px_now = _clean_scalar(close[-1])
+    px_1y = _clean_scalar(close[-252]) if close.size > 252 else None
+    return px_now, px_1y
+
+
 def compute_ratios(
     income: pd.DataFrame,
     balance: pd.DataFrame,
@@ -163,73 +484,135 @@ def compute_ratios(
         "price": None,
     }
 
-    # ----- Income statement -----
-    revenue = _get_item(income, ["Total Revenue", "TotalRevenue", "Revenue"])
-    net_income = _get_item(
-        income, ["Net Income", "NetIncome", "Net Income Common Stockholders"]
-    )
-
-    # ----- Balance sheet -----
-    total_equity = _get_item(
-        balance, ["Total Stockholder Equity", "Total Equity", "TotalEquity"]
-    )
-    total_debt = _get_item(
-        balance, ["Total Debt", "TotalDebt", "Long Term Debt", "LongTermDebt"]
-    )
-    current_assets = _get_item(
-        balance, ["Total Current Assets", "Current Assets", "CurrentAssets"]
-    )
-    current_liab = _get_item(
-        balance,
-        ["Total Current Liabilities", "Current Liabilities", "CurrentLiabilities"],
-    )
+    (
+        revenue,
+        net_income,
+        total_equity,
+        total_debt,
+        current_assets,
+        current_liab,
+    ) = _statement_items(income, balance)
 
     # Store raw numbers (already cleaned or None)
     metrics["revenue"] = revenue
     metrics["net_income"] = net_income
 
     # Net margin
-    if _is_valid_number(revenue) and _is_valid_number(net_income) and revenue != 0:
-        metrics["net_margin"] = _clean_scalar(net_income / revenue)
+    if _finite(revenue) and _finite(net_income) and revenue:
+        v = net_income / revenue
+        metrics["net_margin"] = v if _finite(v) else None
 
     # ROE
-    if _is_valid_number(total_equity) and _is_valid_number(net_income) and total_equity != 0:
-        metrics["roe"] = _clean_scalar(net_income / total_equity)
+    if _finite(total_equity) and _finite(net_income) and total_equity:
+        v = net_income / total_equity
+        metrics["roe"] = v if _finite(v) else None
 
     # Debt/Equity
-    if _is_valid_number(total_equity) and _is_valid_number(total_debt) and total_equity != 0:
-        metrics["debt_to_equity"] = _clean_scalar(total_debt / total_equity)
+    if _finite(total_equity) and _finite(total_debt) and total_equity:
+        v = total_debt / total_equity
+        metrics["debt_to_equity"] = v if _finite(v) else None
 
     # Current ratio
-    if _is_valid_number(current_assets) and _is_valid_number(current_liab) and current_liab != 0:
-        metrics["current_ratio"] = _clean_scalar(current_assets / current_liab)
+    if _finite(current_assets) and _finite(current_liab) and current_liab:
+        v = current_assets / current_liab
+        metrics["current_ratio"] = v if _finite(v) else None
 
     # ----- Price & returns -----
-    if isinstance(price_hist, pd.DataFrame) and not price_hist.empty:
-        try:
-            price_val = price_hist["Close"].iloc[-1]
-            metrics["price"] = _clean_scalar(price_val)
-        except Exception:
-            metrics["price"] = None
-
-        if len(price_hist) > 252:
-            try:
-                px_now = float(price_hist["Close"].iloc[-1])
-                px_1y = float(price_hist["Close"].iloc[-252])
-                if px_1y != 0:
-                    metrics["one_year_return"] = _clean_scalar(px_now / px_1y - 1.0)
-            except Exception:
-                metrics["one_year_return"] = None
+    px_now, px_1y = price_points(price_hist)
+    metrics["price"] = px_now
+    if _finite(px_now) and _finite(px_1y) and px_1y:
+        v = px_now / px_1y - 1.0
+        metrics["one_year_return"] = v if _finite(v) else None
 
-    # Final safety pass (not strictly needed, but cheap)
-    for k, v in list(metrics.items()):
-        metrics[k] = _clean_scalar(v)
+    # Every value above is already None or a finite float; checked in dev only
+    # (asserts are stripped under python -O).
+    assert all(v is None or (isinstance(v, float) and math.isfinite(v)) for v in metrics.values())
 
     return metrics
 
 
+_KERNEL_KEYS = ("net_margin", "roe", "debt_to_equity", "current_ratio", "one_year_return")
+
+
+def _ratios_kernel(
+    rev: np.ndarray,
+    ni: np.ndarray,
+    eq: np.ndarray,
+    debt: np.ndarray,
+    ca: np.ndarray,
+    cl: np.ndarray,
+    px_now: np.ndarray,
+    px_1y: np.ndarray,
+) -> np.ndarray:
+    """
+    Elementwise ratios over 1-D float64 arrays (NaN = missing), one slot per company.
+    Returns a 5 x N array in _KERNEL_KEYS order; zero denominators and
+    non-finite results come out as NaN.
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        out = np.stack([ni / rev, ni / eq, debt / eq, ca / cl, px_now / px_1y - 1.0])
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def compute_ratios_batch(
+    statements: List[Tuple[pd.DataFrame, pd.DataFrame]],
+    prices: List[Tuple[Optional[float], Optional[float]]],
+) -> List[Dict[str, Optional[float]]]:
+    """
+    compute_ratios for many companies at once. statements holds (income, balance)
+    pairs and prices the matching (latest, year-ago) closes, as returned by
+    price_points() or fetch_close_points(). Statement items are
+    extracted per company; the ratio math runs in one vectorized pass.
+    Returns one dict per company, with the same JSON-safe keys as compute_ratios.
+    """
+    if not statements:
+        return []
+
+    raw = np.array(
+        [_statement_items(inc, bal) + tuple(px) for (inc, bal), px in zip(statements, prices)],
+        dtype=np.float64,
+    )
+    ratios = _ratios_kernel(*raw.T).T.tolist()
+
+    results: List[Dict[str, Optional[float]]] = []
+    for row, values in zip(raw.tolist(), ratios):
+        metrics: Dict[str, Optional[float]] = {
+            "revenue": row[0],
+            "net_income": row[1],
+            "price": row[6],
+        }
+        metrics.update(zip(_KERNEL_KEYS, values))
+        results.append({k: (v if v == v else None) for k, v in metrics.items()})
+    return results
+
+
 # ---------- Statements to JSON-safe dict ----------
 
+def _cell_clean(v):
+    """
+    JSON-safe value for one cell of an object-dtype statement:
+    NaN/inf -> None, numbers -> float, arrays -> first scalar, anything else -> str.
+    """
+    # Numpy array / list / Series: take first scalar value if possible
+    if isinstance(v, (np.ndarray, pd.Series, list, tuple)):
+        arr = np.array(v).flatten()
+        if arr.size == 0 or np.all(pd.isna(arr)):
+            return None
+        return _clean_scalar(arr[0])
+
+    # Missing value?
+    if pd.isna(v):
+        return None
+
+    # Numeric?
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        return _clean_scalar(v)
+
+    # Fallback: string representation (JSON-safe)
+    return str(v)
+
+
 def dataframe_to_statement(df: pd.DataFrame, max_cols: int = 3):
     """
     Convert a wide financial DataFrame (years as columns) into a JSON-friendly dict.
@@ -237,6 +620,8 @@ def dataframe_to_statement(df: pd.DataFrame, max_cols: int = 3):
       - NaN/inf -> None
       - numpy scalars -> Python floats
       - other types -> str or None
+    All-numeric frames (the usual case) are cleaned in one NumPy pass;
+    object-dtype frames fall back to per-cell cleaning.
     """
     if df is None or df.empty:
         return None
@@ -244,34 +629,15 @@ def dataframe_to_statement(df: pd.DataFrame, max_cols: int = 3):
     cols = list(df.columns[:max_cols])
     sub = df[cols]
 
-    clean_data: List[List[Optional[float]]] = []
-
-    for _, row in sub.iterrows():
-        clean_row: List[Optional[float]] = []
-        for v in row.tolist():
-            # Missing value?
-            if pd.isna(v):
-                clean_row.append(None)
-                continue
-
-            # Numeric?
-            if isinstance(v, (int, float, np.integer, np.floating)):
-                clean_row.append(_clean_scalar(v))
-                continue
-
-            # Numpy array / list / Series: take first scalar value if possible
-            if isinstance(v, (np.ndarray, pd.Series, list, tuple)):
-                arr = np.array(v).flatten()
-                if arr.size == 0 or np.all(pd.isna(arr)):
-                    clean_row.append(None)
-                else:
-                    clean_row.append(_clean_scalar(arr[0]))
-                continue
-
-            # Fallback: string representation (JSON-safe)
-            clean_row.append(str(v))
-
-        clean_data.append(clean_row)
+    clean_data: List[List[Optional[float]]]
+    if all(pd.api.types.is_numeric_dtype(t) for t in sub.dtypes):
+        arr = sub.to_numpy(dtype=np.float64, na_value=np.nan)
+        clean_data = np.where(np.isfinite(arr), arr, None).tolist()
+    else:
+        clean_data = [
+            [_cell_clean(v) for v in row]
+            for row in sub.to_numpy(dtype=object).tolist()
+        ]
 
     return {
         "columns": [str(c) for c in cols],
@@ -1,15 +1,21 @@
 # main.py
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import List
-import math
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import numpy as np
 import pandas as pd
-import io
+import xlsxwriter
 import os
-from fastapi import Depends, FastAPI, HTTPException, status
-from fastapi.responses import FileResponse,StreamingResponse
+import re
+import tempfile
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import exists
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
 import google.generativeai as genai
@@ -59,9 +65,12 @@ from auth import (
 from database import Base, engine
 from finance import (
     fetch_price_history,
+    fetch_close_points_batch,
     fetch_fundamentals,
     compute_ratios,
+    compute_ratios_batch,
     dataframe_to_statement,
+    _first_non_na,
 )
 from models import User, Company
 from schemas import (
@@ -76,14 +85,25 @@ from schemas import (
     StatementResponse,
 )
 
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="Logistics Financial Analytics Web App",
     description="FastAPI + OAuth2 + SQLite + yfinance",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
+
+@app.on_event("startup")
+def create_tables():
+    # Once per worker, not per import. Set AUTO_CREATE_TABLES=0 when the schema
+    # is managed outside the app, to skip the catalog introspection on boot.
+    if os.getenv("AUTO_CREATE_TABLES", "1") == "1":
+        Base.metadata.create_all(bind=engine)
+        # create_all skips existing tables, so indexes added to a model later
+        # (e.g. ix_companies_owner_segment_name) are created here if missing
+        for index in Company.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 SECRET_KEY_ENV = os.getenv("SECRET_KEY")
 if SECRET_KEY_ENV:
     try:
@@ -122,78 +142,171 @@ else:
 PORT = int(os.getenv("PORT", "8000"))
 
 
-# Serve static front-end
+# Serve static front-end assets (index.html gets its own route on "/", at the bottom)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
-@app.get("/", include_in_schema=False)
-def root():
-    return FileResponse("static/index.html")
 
+# ========= Helpers =========
 
+# Shared pool for blocking work (yfinance HTTP, DB queries, Excel builds) in async
+# endpoints. The work is I/O-bound, so it is sized well above the CPU count.
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IO_POOL", "32")),
+    thread_name_prefix="finapp-io",
+)
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    EXECUTOR.shutdown(wait=False)
+
+
+def _run_io(fn, *args):
+    """Run a blocking call on EXECUTOR and return an awaitable for its result."""
+    return asyncio.get_running_loop().run_in_executor(EXECUTOR, fn, *args)
+
+
+
+def _get_owned_company(db: Session, company_id: int, user: User) -> Company:
+    """
+    Company by primary key, or 404 unless it belongs to user.
+    db.get goes through the session identity map instead of building a query.
+    """
+    company = db.get(Company, company_id)
+    if company is None or company.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return company
+
+
+def _body_etag(body: bytes) -> str:
+    """Strong validator for a serialized response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(t.strip().removeprefix("W/") in (etag, "*") for t in header.split(","))
+
+
+def _clean_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON-safe copy of a yfinance info dict, classified in bulk:
+      - arrays / lists / Series -> their first non-NA element
+      - NA values and non-finite numbers are dropped
+      - numbers -> plain floats; everything else (str, dict, ...) is kept as is
+    """
+    if not info:
+        return {}
+
+    keys = list(info)
+    vals = np.fromiter(info.values(), dtype=object, count=len(keys))
+
+    # -- Arrays / lists / Series first (rare in info) --
+    is_seq = np.fromiter(
+        (isinstance(v, (np.ndarray, pd.Series, list, tuple)) for v in vals),
+        dtype=bool,
+        count=len(vals),
+    )
+    for i in np.flatnonzero(is_seq):
+        vals[i] = _first_non_na(vals[i])
+
+    # -- Now scalars: one isna pass over everything --
+    keep = ~pd.isna(vals).astype(bool)
+
+    # -- Numeric: cast once, drop NaN/inf --
+    is_num = np.fromiter(
+        (isinstance(v, (int, float, np.integer, np.floating)) for v in vals),
+        dtype=bool,
+        count=len(vals),
+    )
+    num_idx = np.flatnonzero(keep & is_num)
+    nums = vals[num_idx].astype(np.float64)
+    keep[num_idx[~np.isfinite(nums)]] = False
+    vals[num_idx] = nums.tolist()
+
+    return {k: v for k, v, ok in zip(keys, vals.tolist(), keep) if ok}
 
-# ========= Helpers =========
 
 def order_statement_rows(df: pd.DataFrame, priorities: list) -> pd.DataFrame:
     """
     Reorder df rows according to an ordered list of priority keywords.
-    Each priority matches labels by exact or contains (case-insensitive).
-    Unmatched rows are appended in original order.
+    Each row is ranked by the priority it equals (case-insensitive) or, failing that,
+    the first priority found in its label. Rows sharing a rank keep their original
+    order; unmatched rows are appended in original order.
     """
     if df is None or df.empty:
         return pd.DataFrame()
 
-    orig_index = [str(i) for i in df.index.tolist()]
-    used = set()
-    ordered_rows = []
-
-    # exact and then contains
-    for p in priorities:
-        p_low = p.lower()
-        # exact match first
-        for idx, lab in enumerate(orig_index):
-            if idx in used:
-                continue
-            if lab.lower() == p_low:
-                ordered_rows.append(lab)
-                used.add(idx)
-                break
-        # contains match next
-        if any(r.lower() == p_low for r in ordered_rows):
-            continue
-        for idx, lab in enumerate(orig_index):
-            if idx in used:
-                continue
-            if p_low in lab.lower():
-                ordered_rows.append(lab)
-                used.add(idx)
-                break
-
-    # append remaining in original order
-    for idx, lab in enumerate(orig_index):
-        if idx not in used:
-            ordered_rows.append(lab)
-            used.add(idx)
-
-    ordered_rows_filtered = [r for r in ordered_rows if r in orig_index]
-    if not ordered_rows_filtered:
-        return df.copy()
-    return df.loc[ordered_rows_filtered]
+    # Exact hits are dict probes; "contains" hits come from one regex union,
+    # where the matching named group gives the priority index
+    exact: Dict[str, int] = {}
+    for i, p in enumerate(priorities):
+        exact.setdefault(p.lower(), i)
+    pat = re.compile("|".join(f"(?P<g{i}>{re.escape(p.lower())})" for i, p in enumerate(priorities)))
+    unmatched = len(priorities)
+
+    def rank(lab: str) -> int:
+        i = exact.get(lab)
+        if i is not None:
+            return i
+        m = pat.search(lab) if priorities else None
+        return m.lastindex - 1 if m else unmatched
+
+    ranks = [rank(str(i).lower()) for i in df.index.tolist()]
+    order = sorted(range(len(ranks)), key=ranks.__getitem__)  # stable: ties keep original order
+    return df.iloc[order]
 
 
 def _norm_df(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize df: string index/cols, drop fully-empty rows/cols"""
     if df is None or df.empty:
         return pd.DataFrame()
-    df2 = df.copy()
+    # drop columns/rows that are all NA: one mask shared by both axes,
+    # and a single slice (which is already a new frame, so no .copy())
+    na = pd.isna(df.to_numpy())
+    df2 = df.iloc[~na.all(axis=1), ~na.all(axis=0)]
     df2.index = df2.index.astype(str)
     df2.columns = [str(c) for c in df2.columns]
-    # drop columns/rows that are all NA
-    df2 = df2.loc[:, ~df2.isna().all(axis=0)]
-    df2 = df2.loc[~df2.isna().all(axis=1)]
     return df2
 
 
+async def _fetch_market_data(
+    tickers: List[str],
+) -> Dict[str, Tuple[Tuple[Optional[float], Optional[float]], Dict[str, pd.DataFrame]]]:
+    """
+    Fetch closing prices and fundamentals for every ticker concurrently.
+    Both are network-bound yfinance round-trips; running them in threads
+    keeps the event loop free to serve other requests during the waits.
+    Prices for all tickers come from one batched download of the latest and
+    year-ago closes, not the full history.
+    Returns {ticker: ((px_now, px_1y), fundamentals)}.
+    """
+    unique = list(dict.fromkeys(tickers))
+    points, *funds = await asyncio.gather(
+        _run_io(fetch_close_points_batch, unique),
+        *(_run_io(fetch_fundamentals, t) for t in unique),
+    )
+    return {t: (points[t], fundamentals) for t, fundamentals in zip(unique, funds)}
+
+
+async def _portfolio_ratios(tickers: List[str]) -> List[Dict[str, Optional[float]]]:
+    """
+    Ratios for each ticker (in order): data is fetched concurrently, then
+    all companies go through one vectorized compute_ratios_batch call.
+    """
+    market = await _fetch_market_data(tickers)
+    statements = []
+    prices = []
+    for t in tickers:
+        points, fundamentals = market[t]
+        statements.append((fundamentals["income"], fundamentals["balance"]))
+        prices.append(points)
+    return compute_ratios_batch(statements, prices)
+
+
 # Priority lists: tweak these if you need different labels
 INCOME_PRIORITIES = [
     "Total Revenue", "Revenue", "Operating Revenue", "Net Revenue",
@@ -226,8 +339,7 @@ CASH_PRIORITIES = [
 
 @app.post("/register", response_model=UserOut)
 def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.username == user_in.username).first()
-    if existing:
+    if db.query(exists().where(User.username == user_in.username)).scalar():
         raise HTTPException(status_code=400, detail="Username already registered")
     hashed_pw = get_password_hash(user_in.password)
     user = User(username=user_in.username, hashed_password=hashed_pw)
@@ -293,13 +405,7 @@ def delete_company(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    company = (
-        db.query(Company)
-        .filter(Company.id == company_id, Company.owner_id == current_user.id)
-        .first()
-    )
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
+    company = _get_owned_company(db, company_id, current_user)
     db.delete(company)
     db.commit()
     return
@@ -308,32 +414,32 @@ def delete_company(
 # ========= DASHBOARD & DETAIL =========
 
 @app.get("/dashboard", response_model=DashboardResponse)
-def get_dashboard(
+async def get_dashboard(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    companies = db.query(Company).filter(Company.owner_id == current_user.id).all()
-    if not companies:
+    # Plain column rows: skips ORM instance hydration for read-only data
+    query = (
+        db.query(Company)
+        .filter(Company.owner_id == current_user.id)
+        .with_entities(Company.id, Company.name, Company.ticker, Company.segment)
+    )
+    rows = await _run_io(query.all)
+    if not rows:
         return DashboardResponse(companies=[])
 
+    all_ratios = await _portfolio_ratios([ticker for _, _, ticker, _ in rows])
     metrics_list: List[CompanyMetrics] = []
 
-    for c in companies:
-        price_hist = fetch_price_history(c.ticker, period="5y")
-        fundamentals = fetch_fundamentals(c.ticker)
-        ratios = compute_ratios(
-            fundamentals["income"],
-            fundamentals["balance"],
-            fundamentals["cashflow"],
-            price_hist,
-        )
-
+    # Columns come from the DB and ratios are JSON-safe floats/None by construction,
+    # so skip per-field validation
+    for (cid, name, ticker, segment), ratios in zip(rows, all_ratios):
         metrics_list.append(
-            CompanyMetrics(
-                id=c.id,
-                name=c.name,
-                ticker=c.ticker,
-                segment=c.segment,
+            CompanyMetrics.model_construct(
+                id=cid,
+                name=name,
+                ticker=ticker,
+                segment=segment,
                 price=ratios["price"],
                 revenue=ratios["revenue"],
                 net_income=ratios["net_income"],
@@ -347,33 +453,30 @@ def get_dashboard(
 
     return DashboardResponse(companies=metrics_list)
 @app.get("/analytics/sector")
-def sector_analytics(
+async def sector_analytics(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     # Reuse the dashboard metrics
-    companies = db.query(Company).filter(Company.owner_id == current_user.id).all()
-    if not companies:
+    query = (
+        db.query(Company)
+        .filter(Company.owner_id == current_user.id)
+        .with_entities(Company.name, Company.ticker, Company.segment)
+    )
+    rows = await _run_io(query.all)
+    if not rows:
         return {"text": "No companies added yet. Please add logistics companies to view sector analysis."}
 
     # Build a compact summary of the metrics for Gemini
-    from schemas import CompanyMetrics  # if not already imported
+    all_ratios = await _portfolio_ratios([ticker for _, ticker, _ in rows])
     metrics_list = []
 
-    for c in companies:
-        price_hist = fetch_price_history(c.ticker, period="5y")
-        fundamentals = fetch_fundamentals(c.ticker)
-        ratios = compute_ratios(
-            income=fundamentals["income"],
-            balance=fundamentals["balance"],
-            cashflow=fundamentals["cashflow"],
-            price_hist=price_hist,
-        )
+    for (name, ticker, segment), ratios in zip(rows, all_ratios):
         metrics_list.append(
             {
-                "name": c.name,
-                "ticker": c.ticker,
-                "segment": c.segment,
+                "name": name,
+                "ticker": ticker,
+                "segment": segment,
                 "revenue": ratios.get("revenue"),
                 "net_income": ratios.get("net_income"),
                 "net_margin": ratios.get("net_margin"),
@@ -395,24 +498,20 @@ def sector_analytics(
         "Now write the 150-word commentary:"
     )
 
-    text = generate_gemini_text(prompt, max_words=150)
+    text = await _run_io(generate_gemini_text, prompt, 150)
     return {"text": text}
 @app.get("/analytics/company/{company_id}")
-def company_analytics(
+async def company_analytics(
     company_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    c = (
-        db.query(Company)
-        .filter(Company.id == company_id, Company.owner_id == current_user.id)
-        .first()
-    )
-    if not c:
-        raise HTTPException(status_code=404, detail="Company not found")
+    c = await _run_io(_get_owned_company, db, company_id, current_user)
 
-    price_hist = fetch_price_history(c.ticker, period="5y")
-    fundamentals = fetch_fundamentals(c.ticker)
+    price_hist, fundamentals = await asyncio.gather(
+        _run_io(fetch_price_history, c.ticker, "5y"),
+        _run_io(fetch_fundamentals, c.ticker),
+    )
     ratios = compute_ratios(
         income=fundamentals["income"],
         balance=fundamentals["balance"],
@@ -432,34 +531,28 @@ def company_analytics(
         "Now write the 100-word commentary:"
     )
 
-    text = generate_gemini_text(prompt, max_words=100)
+    text = await _run_io(generate_gemini_text, prompt, 100)
     return {"text": text}
 
 @app.get("/companies/{company_id}/detail", response_model=CompanyDetailResponse)
-@app.get("/companies/{company_id}/detail", response_model=CompanyDetailResponse)
-def company_detail(
+async def company_detail(
     company_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     # ---------- 1. Fetch company ----------
-    c = (
-        db.query(Company)
-        .filter(Company.id == company_id, Company.owner_id == current_user.id)
-        .first()
-    )
-    if not c:
-        raise HTTPException(status_code=404, detail="Company not found")
+    c = await _run_io(_get_owned_company, db, company_id, current_user)
 
-    # ---------- 2. Fetch fundamentals ----------
-    fundamentals = fetch_fundamentals(c.ticker)
+    # ---------- 2-3. Fundamentals + price history (concurrently) ----------
+    fundamentals, price_hist = await asyncio.gather(
+        _run_io(fetch_fundamentals, c.ticker),
+        _run_io(fetch_price_history, c.ticker, "5y"),
+    )
     income_df = fundamentals.get("income")
     balance_df = fundamentals.get("balance")
     cashflow_df = fundamentals.get("cashflow")
-    info_df = fundamentals.get("info")
-
-    # ---------- 3. Price history ----------
-    price_hist = fetch_price_history(c.ticker, period="5y")
+    info_raw = fundamentals.get("info_raw") or {}
 
     # ---------- 4. Compute ratios ----------
     ratios = compute_ratios(
@@ -470,47 +563,16 @@ def company_detail(
     )
 
     # ---------- 5. Build safe info_dict ----------
-    info_dict = {}
-
-    if info_df is not None and not info_df.empty:
-        for idx, row in info_df.iterrows():
-            val = row["value"]
-
-            # -- Arrays / lists / Series first --
-            if isinstance(val, (np.ndarray, pd.Series, list, tuple)):
-                arr = np.array(val).flatten()
-                if arr.size == 0 or np.all(pd.isna(arr)):
-                    continue
-                mask = ~pd.isna(arr)
-                if not mask.any():
-                    continue
-                val = arr[mask][0]
-
-            # -- Now scalar --
-            if pd.isna(val):
-                continue
-
-            # Numeric
-            if isinstance(val, (int, float, np.integer, np.floating)):
-                try:
-                    v = float(val)
-                    if math.isnan(v) or math.isinf(v):
-                        continue
-                    val = v
-                except Exception:
-                    continue
-
-            # All remaining types (str, bool, etc.) are JSON-safe
-            info_dict[idx] = val
+    info_dict = _clean_info(info_raw)
 
     # ---------- 6. Statements (Income, Balance, Cash Flow) ----------
-    income_json = dataframe_to_statement(income_df, max_cols=3)
-    balance_json = dataframe_to_statement(balance_df, max_cols=3)
-    cf_json = dataframe_to_statement(cashflow_df, max_cols=3)
-
-    def to_statement(obj):
-        if obj is None:
+    def to_statement(df):
+        # Missing statement: skip the builder entirely
+        if df is None or df.empty:
             return None
+        obj = dataframe_to_statement(df, max_cols=3)
+        # Validated: the object-dtype fallback in dataframe_to_statement can yield
+        # str cells, and the raw Response below skips FastAPI's response_model check
         return StatementResponse(
             columns=obj["columns"],
             index=obj["index"],
@@ -518,37 +580,68 @@ def company_detail(
         )
 
     # ---------- 7. Final JSON-safe response ----------
-    return CompanyDetailResponse(
+    payload = CompanyDetailResponse(
         info=info_dict,
         ratios=ratios,
-        income_statement=to_statement(income_json),
-        balance_sheet=to_statement(balance_json),
-        cash_flow=to_statement(cf_json),
+        income_statement=to_statement(income_df),
+        balance_sheet=to_statement(balance_df),
+        cash_flow=to_statement(cashflow_df),
     )
+    body = payload.model_dump_json().encode()
 
+    # Statements missing (e.g. a transient yfinance failure): no validator, so the
+    # browser doesn't hold on to the empty copy
+    if payload.income_statement is None and payload.balance_sheet is None and payload.cash_flow is None:
+        return Response(content=body, media_type="application/json")
 
+    # Conditional GET: validator is a hash of the body actually served; the
+    # fetches above are cache hits on repeat views, so a 304 stays cheap
+    etag = _body_etag(body)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers)
+    return Response(content=body, media_type="application/json", headers=cache_headers)
 
-@app.get("/companies/{company_id}/download", response_class=StreamingResponse)
-def download_company_excel(
-    company_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-):
-    # validate company
-    c = (
-        db.query(Company)
-        .filter(Company.id == company_id, Company.owner_id == current_user.id)
-        .first()
-    )
-    if not c:
-        raise HTTPException(status_code=404, detail="Company not found")
 
-    # fetch fundamentals
-    fundamentals = fetch_fundamentals(c.ticker)
+
+# xlsxwriter cell formats for the export (formats are per-workbook; the specs aren't)
+HEADER_SPEC = {"bold": True, "bg_color": "#F3F6F9", "border": 1}
+NUM_SPEC = {"num_format": "#,##0.00", "border": 1}
+INT_SPEC = {"num_format": "#,##0", "border": 1}
+TEXT_SPEC = {"border": 1}
+
+# Exports up to this size stay in memory; larger ones spill to a temp file
+XLSX_SPOOL_MAX = 1 << 20
+XLSX_CHUNK = 64 * 1024
+
+
+def _xl_value(v):
+    """
+    Cell value the way pandas' Excel writer stores it: NA / non-finite -> blank,
+    numpy scalars -> Python numbers, anything else non-numeric -> str.
+    """
+    if isinstance(v, np.generic):
+        v = v.item()
+    if v is None or isinstance(v, (str, bool)):
+        return v
+    if isinstance(v, (int, float)):
+        return v if np.isfinite(v) else None
+    if pd.api.types.is_scalar(v) and pd.isna(v):
+        return None
+    return str(v)
+
+
+def _build_xlsx(fundamentals: Dict[str, Any]) -> tempfile.SpooledTemporaryFile:
+    """
+    Build the statements workbook (income, balance, cash flow, company info) into a
+    spooled temp file, rewound to the start. The caller owns the file and must close it.
+    Pure CPU work with no request state, so endpoints can run it off the event loop.
+    Cells are written straight through xlsxwriter, skipping pandas' per-cell to_excel dispatch.
+    """
     income_df = fundamentals.get("income")
     balance_df = fundamentals.get("balance")
     cashflow_df = fundamentals.get("cashflow")
-    info_df = fundamentals.get("info")
+    info_raw = fundamentals.get("info_raw") or {}
 
     # normalize and order
     income_df_norm = _norm_df(income_df)
@@ -560,74 +653,104 @@ def download_company_excel(
     ordered_cash = order_statement_rows(cashflow_df_norm, CASH_PRIORITIES) if not cashflow_df_norm.empty else pd.DataFrame()
 
     # build excel
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        workbook = writer.book
-        header_format = workbook.add_format({"bold": True, "bg_color": "#F3F6F9", "border": 1})
-        num_format = workbook.add_format({"num_format": "#,##0.00", "border": 1})
-        int_format = workbook.add_format({"num_format": "#,##0", "border": 1})
-        text_format = workbook.add_format({"border": 1})
-
-        def write_sheet(name: str, df: pd.DataFrame):
-            if df is None or df.empty:
-                pd.DataFrame({"Note": [f"No data available for {name}"]}).to_excel(writer, sheet_name=name, index=False)
-                ws = writer.sheets[name]
-                ws.set_column(0, 0, 60, text_format)
-                return
-            df_to_write = df.copy()
-            df_to_write.insert(0, "__line__", df_to_write.index)
-            df_to_write.to_excel(writer, sheet_name=name, index=False)
-            ws = writer.sheets[name]
-            nrows, ncols = df_to_write.shape
-            for col_idx, col_name in enumerate(df_to_write.columns):
-                ws.write(0, col_idx, col_name, header_format)
-                if col_idx == 0:
-                    ws.set_column(col_idx, col_idx, 36, text_format)
-                else:
-                    series = df_to_write.iloc[:, col_idx]
-                    if pd.api.types.is_numeric_dtype(series) or series.apply(lambda v: isinstance(v, (int, float, np.integer, np.floating))).any():
-                        # choose integer vs float
-                        any_float = any(isinstance(v, float) and (abs(v - int(v)) > 1e-8) for v in series.dropna().tolist()[:50])
-                        ws.set_column(col_idx, col_idx, 18, num_format if any_float else int_format)
-                    else:
-                        ws.set_column(col_idx, col_idx, 24, text_format)
-            try:
-                ws.autofilter(0, 0, nrows, ncols - 1)
-            except Exception:
-                pass
-
-        write_sheet("Income Statement", ordered_income)
-        write_sheet("Balance Sheet", ordered_balance)
-        write_sheet("Cash Flow", ordered_cash)
-
-        # Company Info sheet (best-effort)
+    # Stays in memory up to XLSX_SPOOL_MAX, then spills to disk
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX, mode="w+b")
+    workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+    header_format = workbook.add_format(HEADER_SPEC)
+    num_format = workbook.add_format(NUM_SPEC)
+    int_format = workbook.add_format(INT_SPEC)
+    text_format = workbook.add_format(TEXT_SPEC)
+
+    def write_sheet(name: str, df: pd.DataFrame):
+        ws = workbook.add_worksheet(name)
+        if df is None or df.empty:
+            ws.write_string(0, 0, "Note", header_format)
+            ws.write_string(1, 0, f"No data available for {name}")
+            ws.set_column(0, 0, 60, text_format)
+            return
+
+        # Header row, then one row per line item: label + values.
+        # Data cells carry no format of their own; set_column below styles them.
+        ws.write_row(0, 0, ["__line__"] + [str(c) for c in df.columns], header_format)
+        if all(pd.api.types.is_numeric_dtype(t) for t in df.dtypes):
+            arr = df.to_numpy(dtype=np.float64, na_value=np.nan)
+            rows = np.where(np.isfinite(arr), arr, None).tolist()
+        else:
+            rows = [[_xl_value(v) for v in row] for row in df.to_numpy(dtype=object).tolist()]
+        for r, (label, row) in enumerate(zip(df.index.astype(str), rows), start=1):
+            ws.write_string(r, 0, label)
+            ws.write_row(r, 1, row)
+
+        nrows, ncols = df.shape[0], df.shape[1] + 1
+        ws.set_column(0, 0, 36, text_format)
+        # Statements are numeric-typed (see finance.fetch_fundamentals), so the
+        # column dtype decides the format; no per-cell isinstance checks.
+        for col_idx, dtype in enumerate(df.dtypes, start=1):
+            if pd.api.types.is_numeric_dtype(dtype):
+                # choose integer vs float
+                vals = df.iloc[:, col_idx - 1].to_numpy(dtype=np.float64, na_value=np.nan)
+                frac = np.modf(vals[~np.isnan(vals)])[0]
+                any_float = bool(np.any(np.abs(frac) > 1e-8))
+                ws.set_column(col_idx, col_idx, 18, num_format if any_float else int_format)
+            else:
+                ws.set_column(col_idx, col_idx, 24, text_format)
         try:
-            if info_df is not None and not info_df.empty:
-                if (info_df.shape[1] == 1) and (info_df.columns[0] == "value"):
-                    info_pairs = [(str(k), v) for k, v in info_df["value"].to_dict().items()]
-                    info_flat = pd.DataFrame(info_pairs, columns=["Key", "Value"])
-                else:
-                    pairs = []
-                    if isinstance(info_df, pd.DataFrame):
-                        for idx, row in info_df.iterrows():
-                            if hasattr(row, "tolist"):
-                                pairs.append((str(idx), ", ".join([str(x) for x in row.tolist()])))
-                            else:
-                                pairs.append((str(idx), str(row)))
-                    info_flat = pd.DataFrame(pairs, columns=["Key", "Value"])
-                if not info_flat.empty:
-                    info_flat.to_excel(writer, sheet_name="Company Info", index=False)
-                    w = writer.sheets["Company Info"]
-                    w.set_column(0, 0, 30, text_format)
-                    w.set_column(1, 1, 50, text_format)
+            ws.autofilter(0, 0, nrows, ncols - 1)
         except Exception:
             pass
 
+    write_sheet("Income Statement", ordered_income)
+    write_sheet("Balance Sheet", ordered_balance)
+    write_sheet("Cash Flow", ordered_cash)
+
+    # Company Info sheet (best-effort)
+    try:
+        if info_raw:
+            w = workbook.add_worksheet("Company Info")
+            w.write_row(0, 0, ["Key", "Value"], header_format)
+            for r, (k, v) in enumerate(info_raw.items(), start=1):
+                w.write_string(r, 0, str(k))
+                w.write(r, 1, _xl_value(v))
+            w.set_column(0, 0, 30, text_format)
+            w.set_column(1, 1, 50, text_format)
+    except Exception:
+        pass
+
+    try:
+        workbook.close()
+    except Exception:
+        output.close()
+        raise
     output.seek(0)
+    return output
+
+
+@app.get("/companies/{company_id}/download", response_class=StreamingResponse)
+async def download_company_excel(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    # validate company
+    c = await _run_io(_get_owned_company, db, company_id, current_user)
+
+    # fetch fundamentals, then build the workbook on the shared pool
+    fundamentals = await _run_io(fetch_fundamentals, c.ticker)
+    output = await _run_io(_build_xlsx, fundamentals)
+
     filename = f"{c.name.replace(' ', '_')}_financials.xlsx"
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
     return StreamingResponse(
-        output,
+        iter(lambda: output.read(XLSX_CHUNK), b""),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers=headers,
-    )
\ No newline at end of file
+        background=BackgroundTask(output.close),
+    )
+
+
+# ========= FRONT-END =========
+
+# index.html served by StaticFiles on the exact path "/" only, so it answers
+# conditional requests with 304 via ETag / Last-Modified without a catch-all
+# mount swallowing Starlette's trailing-slash redirects and 405s.
+app.add_route("/", StaticFiles(directory="static", html=True), name="root")
@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -18,11 +18,15 @@ class User(Base):
 
 class Company(Base):
     __tablename__ = "companies"
+    # Matches list_companies: filter by owner, ordered by segment then name
+    __table_args__ = (
+        Index("ix_companies_owner_segment_name", "owner_id", "segment", "name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True, nullable=False)
+    name = Column(String, nullable=False)
     ticker = Column(String, index=True, nullable=False)
-    segment = Column(String, index=True, nullable=False)
+    segment = Column(String, nullable=False)
 
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="companies")
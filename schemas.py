@@ -1,6 +1,6 @@
 # schemas.py
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 # ----- Auth -----
@@ -26,8 +26,7 @@ class UserOut(UserBase):
     id: int
     is_active: bool
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ----- Companies -----
@@ -45,8 +44,7 @@ class CompanyCreate(CompanyBase):
 class CompanyOut(CompanyBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ----- Dashboard metrics -----